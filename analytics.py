@@ -1,77 +1,63 @@
-import pandas as pd
-from sheets import get_client, SHEET_NAME
+import math
+from datetime import datetime, timedelta
+from store import transactions
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_all_data():
-    """Fetches all data from the Google Sheet and returns a Pandas DataFrame."""
-    client = get_client()
-    if not client:
-        return None
-    
-    try:
-        spreadsheet = client.open(SHEET_NAME)
-        # Iterate over all worksheets to gather data
-        all_data = []
-        for worksheet in spreadsheet.worksheets():
-            data = worksheet.get_all_records()
-            if data:
-                all_data.extend(data)
-        
-        if not all_data:
-            return pd.DataFrame()
-            
-        df = pd.DataFrame(all_data)
-        # Ensure numeric columns are actually numeric
-        df['Amount(g)'] = pd.to_numeric(df['Amount(g)'], errors='coerce')
-        df['Price(INR)'] = pd.to_numeric(df['Price(INR)'], errors='coerce')
-        df['Timestamp'] = pd.to_datetime(df['Timestamp'])
-        return df
-    except Exception as e:
-        logger.error(f"Error fetching data for analytics: {e}")
-        return None
-
-def generate_report(period='weekly'):
+def get_period_start(period, now=None):
+    """Returns the start datetime for 'daily', 'weekly' or 'monthly', else None."""
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == 'daily':
+        return today
+    elif period == 'weekly':
+        return today - timedelta(days=today.weekday())
+    elif period == 'monthly':
+        return today.replace(day=1)
+    return None
+
+def split_by_action(store, rows):
+    """Splits row indices into (sales, buys) using the encoded Action column."""
+    sale_code = store.actions.code_of('Sale')
+    buy_code = store.actions.code_of('Buy')
+    codes = store.actions.codes
+    sales = [i for i in rows if codes[i] == sale_code]
+    buys = [i for i in rows if codes[i] == buy_code]
+    return sales, buys
+
+def column_sum(column, rows):
+    """Sums a numeric column over rows, skipping unreadable (NaN) cells."""
+    return sum(column[i] for i in rows if not math.isnan(column[i]))
+
+def generate_report(period='weekly', store=None):
     """
     Generates a text summary for the given period.
     period: 'daily', 'weekly', 'monthly'
     """
-    df = get_all_data()
-    if df is None or df.empty:
+    store = transactions if store is None else store
+    if not len(store):
         return "No data available."
 
-    now = pd.Timestamp.now()
-    
-    if period == 'daily':
-        start_date = now.normalize()
-        period_name = "Today"
-    elif period == 'weekly':
-        start_date = now - pd.to_timedelta(now.dayofweek, unit='d')
-        start_date = start_date.normalize()
-        period_name = "This Week"
-    elif period == 'monthly':
-        start_date = now.replace(day=1).normalize()
-        period_name = "This Month"
-    else:
+    start_date = get_period_start(period)
+    if start_date is None:
         return "Invalid period."
+    period_name = {'daily': "Today", 'weekly': "This Week", 'monthly': "This Month"}[period]
 
     # Filter data
-    mask = df['Timestamp'] >= start_date
-    period_df = df.loc[mask]
+    period_rows = store.rows_since(start_date)
 
-    if period_df.empty:
+    if not period_rows:
         return f"No transactions found for {period_name}."
 
     # Calculate stats
-    sales = period_df[period_df['Action'] == 'Sale']
-    buys = period_df[period_df['Action'] == 'Buy']
+    sales, buys = split_by_action(store, period_rows)
 
-    total_sales_amount = sales['Amount(g)'].sum()
-    total_revenue = sales['Price(INR)'].sum()
+    total_sales_amount = column_sum(store.amounts, sales)
+    total_revenue = column_sum(store.prices, sales)
     
-    total_bought_amount = buys['Amount(g)'].sum()
-    total_cost = buys['Price(INR)'].sum()
+    total_bought_amount = column_sum(store.amounts, buys)
+    total_cost = column_sum(store.prices, buys)
     
     profit = total_revenue - total_cost
 
@@ -88,52 +74,48 @@ def generate_report(period='weekly'):
     
     return report
 
-def generate_detailed_report(period='weekly'):
+def generate_detailed_report(period='weekly', store=None):
     """Generates a detailed breakdown by person."""
-    df = get_all_data()
-    if df is None or df.empty:
+    store = transactions if store is None else store
+    if not len(store):
         return "No data available."
         
-    # Similar filtering logic as above...
-    now = pd.Timestamp.now()
-    if period == 'daily':
-        start_date = now.normalize()
-    elif period == 'weekly':
-        start_date = now - pd.to_timedelta(now.dayofweek, unit='d')
-        start_date = start_date.normalize()
-    elif period == 'monthly':
-        start_date = now.replace(day=1).normalize()
-    else:
+    start_date = get_period_start(period)
+    if start_date is None:
         return "Invalid period."
 
-    mask = df['Timestamp'] >= start_date
-    period_df = df.loc[mask]
+    period_rows = store.rows_since(start_date)
     
-    if period_df.empty:
+    if not period_rows:
         return "No data."
 
     # Calculate aggregate stats for the period
-    sales = period_df[period_df['Action'] == 'Sale']
-    buys = period_df[period_df['Action'] == 'Buy']
+    sales, buys = split_by_action(store, period_rows)
     
-    total_sales = sales['Price(INR)'].sum()
-    total_cost = buys['Price(INR)'].sum()
+    total_sales = column_sum(store.prices, sales)
+    total_cost = column_sum(store.prices, buys)
     profit = total_sales - total_cost
     
     # Volume Stats
-    vol_sold = sales['Amount(g)'].sum()
-    vol_bought = buys['Amount(g)'].sum()
+    vol_sold = column_sum(store.amounts, sales)
+    vol_bought = column_sum(store.amounts, buys)
     
     # Averages
     avg_sale_price = (total_sales / vol_sold) if vol_sold > 0 else 0
     avg_buy_cost = (total_cost / vol_bought) if vol_bought > 0 else 0
     
-    # Top Buyer (by Revenue)
+    # Top Buyer (by Revenue), grouped on the encoded Buyer/Source column
     top_buyer = "N/A"
-    if not sales.empty:
-        top_buyer_stats = sales.groupby('Buyer/Source')['Price(INR)'].sum().sort_values(ascending=False)
-        if not top_buyer_stats.empty:
-            top_buyer = f"{top_buyer_stats.index[0]} (₹{top_buyer_stats.iloc[0]})"
+    if sales:
+        revenue_by_code = {}
+        for i in sales:
+            if math.isnan(store.prices[i]):
+                continue
+            code = store.entities.codes[i]
+            revenue_by_code[code] = revenue_by_code.get(code, 0) + store.prices[i]
+        if revenue_by_code:
+            top_code = max(revenue_by_code, key=revenue_by_code.get)
+            top_buyer = f"{store.entities.values[top_code]} (₹{revenue_by_code[top_code]})"
 
     report = f"📝 **Detailed Report ({period})**\n\n"
     
@@ -154,40 +136,39 @@ def generate_detailed_report(period='weekly'):
     report += "-"*50 + "\n"
     
     # Sort by timestamp descending (newest first)
-    period_df = period_df.sort_values('Timestamp', ascending=False)
+    period_rows.sort(key=store.timestamps.__getitem__, reverse=True)
     
-    for _, row in period_df.iterrows():
-        date_str = row['Timestamp'].strftime('%Y-%m-%d')
-        action = "Sale" if row['Action'] == 'Sale' else "Buy"
+    for i in period_rows:
+        date_str = store.timestamp(i).strftime('%Y-%m-%d')
+        action = "Sale" if store.actions[i] == 'Sale' else "Buy"
         action = action[:4] # Truncate
-        entity = str(row['Buyer/Source'])[:10]
-        amt = str(row['Amount(g)'])
-        price = str(row['Price(INR)'])
+        entity = store.entities[i][:10]
+        amt = str(store.amounts[i])
+        price = str(store.prices[i])
         
         report += f"{date_str:<10} | {action:<4} | {entity:<10} | {amt:<5} | {price}\n"
         
     report += "```"
     return report
 
-def generate_person_report(person_name):
+def generate_person_report(person_name, store=None):
     """Generates a report for a specific person across all time (or current sheet)."""
-    df = get_all_data()
-    if df is None or df.empty:
+    store = transactions if store is None else store
+    if not len(store):
         return "No data available."
         
     # Filter by Seller (case insensitive)
-    # df['Seller'] might be mixed case, so we normalize
-    mask = df['Seller'].str.lower() == person_name.lower()
-    person_df = df.loc[mask]
+    # Names are matched once against the distinct sellers, then rows by code
+    seller_codes = store.sellers.codes_where(lambda name: name.lower() == person_name.lower())
+    person_rows = [i for i, code in enumerate(store.sellers.codes) if code in seller_codes]
     
-    if person_df.empty:
+    if not person_rows:
         return f"No transactions found for '{person_name}'."
         
-    sales = person_df[person_df['Action'] == 'Sale']
-    buys = person_df[person_df['Action'] == 'Buy']
+    sales, buys = split_by_action(store, person_rows)
     
-    total_sales_amount = sales['Amount(g)'].sum()
-    total_revenue = sales['Price(INR)'].sum()
+    total_sales_amount = column_sum(store.amounts, sales)
+    total_revenue = column_sum(store.prices, sales)
     
     report = f"👤 **Report for {person_name.title()}**\n\n"
     report += f"**Stats:**\n"
@@ -195,19 +176,19 @@ def generate_person_report(person_name):
     report += f"• Rev: ₹{total_revenue}\n"
     report += f"• Txns: {len(sales)}\n\n"
     
-    if not sales.empty:
+    if sales:
         report += "**Recent Sales:**\n"
         report += "```\n"
         report += f"{'Date':<10} | {'Buyer':<10} | {'Amt':<5} | {'Price'}\n"
         report += "-"*42 + "\n"
         
         # Show last 10 sales (increased from 5)
-        recent = sales.tail(10)
-        for _, row in recent.iterrows():
-            date_str = row['Timestamp'].strftime('%Y-%m-%d')
-            buyer = str(row['Buyer/Source'])[:10] # Truncate to 10 chars
-            amt = str(row['Amount(g)'])
-            price = str(row['Price(INR)'])
+        recent = sales[-10:]
+        for i in recent:
+            date_str = store.timestamp(i).strftime('%Y-%m-%d')
+            buyer = store.entities[i][:10] # Truncate to 10 chars
+            amt = str(store.amounts[i])
+            price = str(store.prices[i])
             
             report += f"{date_str:<10} | {buyer:<10} | {amt:<5} | {price}\n"
         report += "```"
@@ -0,0 +1,113 @@
+import hmac
+import io
+import os
+import logging
+from http.server import BaseHTTPRequestHandler
+from itertools import chain
+from urllib.parse import urlparse, parse_qsl
+
+from export import parse_export_args, filter_rows, iter_rows, write_csv, export_filename
+
+# Setup logging
+logging.basicConfig(
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    level=logging.INFO
+)
+
+class ChunkedWriter(io.RawIOBase):
+    """
+    Writes HTTP/1.1 chunked transfer encoding to a socket file.
+    The terminating chunk is only sent by finish(), so a response cut off by
+    an error is seen by the client as incomplete rather than as a whole file.
+    """
+    def __init__(self, wfile):
+        self.wfile = wfile
+        self.aborted = False
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.aborted or not data:
+            return len(data)
+        self.wfile.write(b"%x\r\n" % len(data) + bytes(data) + b"\r\n")
+        return len(data)
+
+    def finish(self):
+        self.wfile.write(b"0\r\n\r\n")
+
+    def abort(self):
+        # Drop anything written afterwards (e.g. a gzip trailer on cleanup)
+        self.aborted = True
+
+class handler(BaseHTTPRequestHandler):
+    """
+    GET /api/export?format=csv|gz&from=YYYY-MM-DD&to=YYYY-MM-DD&seller=Name
+    with header 'Authorization: Bearer <EXPORT_TOKEN>'.
+    Streams the transaction history as CSV. Disabled unless EXPORT_TOKEN is set.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def send_text(self, status, text):
+        body = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def is_authorized(self):
+        # The token is sent as a header so it stays out of URLs and access logs
+        export_token = os.getenv('EXPORT_TOKEN')
+        if not export_token:
+            return False
+        supplied = self.headers.get('Authorization', '')
+        return hmac.compare_digest(supplied.encode('utf-8'), f"Bearer {export_token}".encode('utf-8'))
+
+    def do_GET(self):
+        params = dict(parse_qsl(urlparse(self.path).query))
+
+        if not self.is_authorized():
+            self.send_text(403, 'Forbidden')
+            return
+
+        args = [params.pop('format', 'csv')]
+        args += [f"{key}={value}" for key, value in params.items()]
+        try:
+            options = parse_export_args(args)
+        except ValueError as e:
+            self.send_text(400, str(e))
+            return
+
+        # Open the source and read the first row before committing to a 200,
+        # so auth or sheet failures surface as an error instead of an empty file
+        try:
+            rows, source = iter_rows()
+            rows = filter_rows(rows, options["start"], options["end"], options["seller"])
+            first = next(rows, None)
+        except Exception as e:
+            logging.error(f"Error opening export source: {e}")
+            self.send_text(500, 'Export failed')
+            return
+        if first is not None:
+            rows = chain([first], rows)
+
+        filename = export_filename(options["compress"])
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/gzip' if options["compress"] else 'text/csv; charset=utf-8')
+        self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+        self.send_header('X-Export-Source', source.encode('ascii', 'replace').decode('ascii'))
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        # Rows are written as they are read, so the full history is never held in memory
+        writer = ChunkedWriter(self.wfile)
+        try:
+            write_csv(rows, writer, options["compress"])
+        except Exception as e:
+            logging.error(f"Error streaming export: {e}")
+            # No terminating chunk: the client sees a truncated transfer
+            writer.abort()
+            self.close_connection = True
+            return
+        writer.finish()
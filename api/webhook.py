@@ -5,6 +5,10 @@ from telegram import Update
 from http.server import BaseHTTPRequestHandler
 import json
 
+# Each serverless instance holds its own copy of the history and only sees the
+# rows it logged, so re-read the sheet before every report unless overridden
+os.environ.setdefault('HISTORY_MAX_AGE', '0')
+
 # Import the application from main
 # Note: we need to make sure main.py doesn't run its main block when imported
 from main import app
@@ -20,6 +24,9 @@ async def process_update(update_json):
         # Initialize the app if not already done
         if not app.updater.running:
              await app.initialize()
+
+        # post_init only runs under run_polling/run_webhook; here the handlers
+        # load the history on first use and retry until it succeeds
         
         update = Update.de_json(update_json, app.bot)
         await app.process_update(update)
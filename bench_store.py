@@ -0,0 +1,80 @@
+"""
+Compares memory per row and load time of the TransactionStore against the
+previous list-of-dicts -> DataFrame path on synthetic sheet rows.
+
+Usage: python bench_store.py [rows]
+The DataFrame comparison is skipped if pandas is not installed.
+"""
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from sheets import HEADERS
+from store import TransactionStore
+
+def make_rows(n):
+    """Synthetic rows shaped like worksheet.get_all_values() output."""
+    random.seed(42)
+    sellers = ["Alice", "Bob", "Charlie", "Deepa", "Esha"]
+    entities = ["Priya", "Ravi", "Unknown", "Supplier", "Kiran", "Meera", "Arjun", "Neha"]
+    start = datetime(2023, 1, 1)
+    rows = []
+    for i in range(n):
+        ts = start + timedelta(minutes=7 * i)
+        year, week, _ = ts.isocalendar()
+        rows.append([
+            ts.strftime("%Y-%m-%d %H:%M:%S"),
+            random.choice(sellers),
+            "Sale" if random.random() < 0.8 else "Buy",
+            random.choice(entities),
+            str(random.randint(1, 200)),
+            str(random.randint(50, 5000)),
+            f"{year}{week}",
+        ])
+    return rows
+
+def dataframe_path(rows):
+    """The old get_all_data: dict per row, then an inferred DataFrame."""
+    import pandas as pd
+    records = [dict(zip(HEADERS, row)) for row in rows]
+    df = pd.DataFrame(records)
+    df['Amount(g)'] = pd.to_numeric(df['Amount(g)'], errors='coerce')
+    df['Price(INR)'] = pd.to_numeric(df['Price(INR)'], errors='coerce')
+    df['Timestamp'] = pd.to_datetime(df['Timestamp'])
+    return df
+
+def measure(build, rows):
+    """Returns (seconds, retained bytes, peak bytes) for build(rows)."""
+    # Timed without tracing, since tracemalloc slows allocation-heavy code
+    t0 = time.perf_counter()
+    build(rows)
+    elapsed = time.perf_counter() - t0
+
+    tracemalloc.start()
+    result = build(rows)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return elapsed, retained, peak
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rows = make_rows(n)
+
+    results = [("TransactionStore", measure(TransactionStore.from_rows, rows))]
+    try:
+        import pandas  # noqa: F401
+        results.append(("dicts -> DataFrame", measure(dataframe_path, rows)))
+    except ImportError:
+        print("pandas not installed; skipping DataFrame comparison")
+
+    print(f"{n} rows")
+    print(f"{'Path':<20} | {'Load (s)':>8} | {'B/row kept':>10} | {'B/row peak':>10}")
+    print("-" * 58)
+    for name, (elapsed, retained, peak) in results:
+        print(f"{name:<20} | {elapsed:>8.3f} | {retained / n:>10.1f} | {peak / n:>10.1f}")
+
+if __name__ == '__main__':
+    main()
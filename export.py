@@ -0,0 +1,117 @@
+import csv
+import gzip
+import io
+import logging
+import os
+import tempfile
+from datetime import datetime
+
+from sheets import HEADERS, iter_sheet_rows
+
+logger = logging.getLogger(__name__)
+
+def parse_export_args(args):
+    """
+    Parses export options from command args or query params.
+    Accepts: 'csv' | 'gz', 'from=YYYY-MM-DD', 'to=YYYY-MM-DD', 'seller=<name>'.
+    Returns a dict of options. Raises ValueError on bad input.
+    """
+    options = {"compress": False, "start": None, "end": None, "seller": None}
+    for arg in args:
+        key, sep, value = arg.partition('=')
+        key = key.lower()
+        if not sep and key in ('csv', 'gz', 'gzip'):
+            options["compress"] = key != 'csv'
+        elif key in ('from', 'to'):
+            # Validate the date; rows are compared on their 'YYYY-MM-DD' prefix
+            datetime.strptime(value, "%Y-%m-%d")
+            options["start" if key == 'from' else "end"] = value
+        elif key == 'seller' and value:
+            options["seller"] = value
+        else:
+            raise ValueError(f"Unknown export option '{arg}'")
+    return options
+
+def iter_snapshot_rows(path):
+    """Yields rows from a local CSV snapshot, one line at a time."""
+    with open(path, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        next(reader, None)  # Skip header
+        for row in reader:
+            yield row
+
+def iter_rows():
+    """
+    Returns (rows, source) for the export. Rows come from the local snapshot
+    if EXPORT_SNAPSHOT points at an existing file, else from the sheet.
+    `source` describes where the rows came from, including the snapshot's age.
+
+    The snapshot is opt-in and nothing in the bot writes it, so keep it current
+    yourself. EXPORT_SNAPSHOT is read per call so a value from .env is honoured.
+    """
+    snapshot_file = os.getenv("EXPORT_SNAPSHOT")
+    if snapshot_file:
+        if os.path.exists(snapshot_file):
+            modified = datetime.fromtimestamp(os.path.getmtime(snapshot_file)).strftime("%Y-%m-%d %H:%M:%S")
+            source = f"snapshot {os.path.basename(snapshot_file)} (modified {modified})"
+            logger.info(f"Exporting from {source}")
+            return iter_snapshot_rows(snapshot_file), source
+        logger.warning(f"EXPORT_SNAPSHOT '{snapshot_file}' not found; exporting from Google Sheets")
+    return iter_sheet_rows(), "Google Sheets"
+
+def filter_rows(rows, start=None, end=None, seller=None):
+    """Lazily filters rows by date range (inclusive) and seller (case insensitive)."""
+    seller = seller.lower() if seller else None
+    for row in rows:
+        if not row or not row[0]:
+            continue
+        date_str = row[0][:10]
+        if start and date_str < start:
+            continue
+        if end and date_str > end:
+            continue
+        if seller and str(row[1]).lower() != seller:
+            continue
+        yield row
+
+def write_csv(rows, fileobj, compress=False):
+    """
+    Streams rows as CSV (optionally gzip-compressed) into a binary file object.
+    The file object is left open. Returns the number of rows written.
+    """
+    raw = gzip.GzipFile(fileobj=fileobj, mode='wb') if compress else fileobj
+    text = io.TextIOWrapper(raw, encoding='utf-8', newline='')
+    writer = csv.writer(text)
+    writer.writerow(HEADERS)
+
+    count = 0
+    for row in rows:
+        # Normalize row width to the sheet schema
+        writer.writerow((list(row) + [''] * len(HEADERS))[:len(HEADERS)])
+        count += 1
+
+    text.flush()
+    text.detach()
+    if compress:
+        raw.close()
+    return count
+
+def export_filename(compress=False):
+    name = f"transactions_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    return name + ".gz" if compress else name
+
+def export_to_tempfile(options):
+    """
+    Writes the filtered export to a temporary file on disk.
+    Returns (file, row_count, source), with the file rewound and ready to send.
+    """
+    rows, source = iter_rows()
+    rows = filter_rows(rows, options["start"], options["end"], options["seller"])
+    f = tempfile.TemporaryFile()
+    try:
+        count = write_csv(rows, f, options["compress"])
+    except Exception:
+        f.close()
+        raise
+    f.seek(0)
+    return f, count, source
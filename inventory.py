@@ -0,0 +1,133 @@
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# Tolerance for gram comparisons, so float rounding doesn't trigger oversell warnings
+EPSILON = 1e-9
+
+
+class Ledger:
+    """
+    Running inventory ledger.
+
+    Keeps grams on hand, the weighted average cost per gram and the
+    realized margin of every sale. Each transaction is applied once, so
+    /stock and /margin are answered from the running totals instead of
+    rescanning the sheet.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.stock = 0.0          # grams on hand
+        self.avg_cost = 0.0       # INR per gram of the stock on hand
+        self.revenue = 0.0        # total sale proceeds
+        self.cogs = 0.0           # cost of the grams sold
+        self.sold = 0.0           # grams sold
+        self.bought = 0.0         # grams bought
+        self.sales_count = 0
+        self.buys_count = 0
+        self.last_sale = None     # (amount, price, cost, margin)
+
+    @property
+    def stock_value(self):
+        return max(self.stock, 0.0) * self.avg_cost
+
+    @property
+    def margin(self):
+        return self.revenue - self.cogs
+
+    def apply(self, action, amount, price):
+        """
+        Applies a single transaction to the ledger.
+        Returns a warning string if a sale exceeds the stock on hand, else None.
+        Transactions with a non-finite amount or price are ignored.
+        """
+        amount = float(amount)
+        price = float(price)
+        warning = None
+
+        if not (math.isfinite(amount) and math.isfinite(price)):
+            logger.warning(f"Ignoring {action} with unreadable amount/price ({amount}, {price}) in ledger")
+            return None
+
+        if action == 'Buy':
+            total = self.stock + amount
+            if self.stock <= EPSILON or total <= EPSILON:
+                # Nothing (or a shortfall) on hand: the new lot sets the cost
+                self.avg_cost = price / amount if amount > EPSILON else 0.0
+            else:
+                self.avg_cost = (self.stock * self.avg_cost + price) / total
+            self.stock += amount
+            self.bought += amount
+            self.buys_count += 1
+
+        elif action == 'Sale':
+            if amount - self.stock > EPSILON:
+                warning = (
+                    f"⚠️ Sale of {amount:g}g exceeds stock on hand "
+                    f"({max(self.stock, 0.0):g}g)."
+                )
+            # Any shortfall is costed at the last known average cost
+            cost = amount * self.avg_cost
+            margin = price - cost
+            self.stock -= amount
+            if abs(self.stock) <= EPSILON:
+                self.stock = 0.0
+            self.sold += amount
+            self.revenue += price
+            self.cogs += cost
+            self.sales_count += 1
+            self.last_sale = (amount, price, cost, margin)
+
+        else:
+            logger.warning(f"Ignoring unknown action '{action}' in ledger")
+
+        return warning
+
+    def rebuild(self, store):
+        """
+        Replays the transaction history held in a TransactionStore.
+        Rows are applied in timestamp order; rows with an unreadable or
+        non-finite amount or price are skipped.
+        """
+        self.reset()
+        skipped = 0
+        for i in store.chronological():
+            amount, price = store.amounts[i], store.prices[i]
+            if not (math.isfinite(amount) and math.isfinite(price)):
+                skipped += 1
+                continue
+            self.apply(store.actions[i], amount, price)
+        if skipped:
+            logger.warning(f"Skipped {skipped} rows with unreadable numbers in ledger rebuild")
+
+    def stock_report(self):
+        report = "📦 **Stock on Hand**\n\n"
+        report += f"• Grams: {self.stock:g}g\n"
+        report += f"• Avg Cost: ₹{self.avg_cost:,.2f}/g\n"
+        report += f"• Value: ₹{self.stock_value:,.2f}\n"
+        report += f"• Bought: {self.bought:g}g ({self.buys_count} Buys)\n"
+        report += f"• Sold: {self.sold:g}g ({self.sales_count} Sales)"
+        if self.stock < -EPSILON:
+            report += f"\n\n⚠️ Stock is negative: {-self.stock:g}g sold without a recorded purchase."
+        return report
+
+    def margin_report(self):
+        margin_pct = (self.margin / self.revenue * 100) if self.revenue else 0
+        report = "💹 **Realized Margin**\n\n"
+        report += f"• Revenue: ₹{self.revenue:,.2f}\n"
+        report += f"• Cost of Goods Sold: ₹{self.cogs:,.2f}\n"
+        report += f"• Margin: ₹{self.margin:,.2f} ({margin_pct:.1f}%)\n"
+        if self.last_sale:
+            amount, price, cost, margin = self.last_sale
+            report += "\n**Last Sale:**\n"
+            report += f"• {amount:g}g for ₹{price:,.2f} (cost ₹{cost:,.2f})\n"
+            report += f"• Margin: ₹{margin:,.2f}"
+        return report
+
+
+# Shared ledger used by the bot handlers
+ledger = Ledger()
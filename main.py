@@ -1,12 +1,17 @@
 import os
+import math
 import logging
+from datetime import datetime
 from dotenv import load_dotenv
 from telegram import Update
 from telegram.ext import ApplicationBuilder, ContextTypes, MessageHandler, CommandHandler, filters
 
-from sheets import log_transaction
+from sheets import log_transaction, iter_sheet_rows
 from message_parser import parse_sales_message
 from analytics import generate_report, generate_detailed_report
+from inventory import ledger
+from store import transactions
+from export import parse_export_args, export_to_tempfile, export_filename
 
 # Load environment variables
 load_dotenv()
@@ -17,6 +22,24 @@ logging.basicConfig(
     level=logging.INFO
 )
 
+def parse_max_age(value):
+    """Parses HISTORY_MAX_AGE (seconds). Returns None if unset or invalid."""
+    if not value:
+        return None
+    try:
+        max_age = float(value)
+    except ValueError:
+        max_age = -1
+    if not math.isfinite(max_age) or max_age < 0:
+        logging.warning(f"Ignoring invalid HISTORY_MAX_AGE '{value}'; expected seconds, e.g. 60")
+        return None
+    return max_age
+
+# Seconds before the in-memory history is re-read from the sheet before answering
+# a report. Unset keeps it until restart; api/webhook.py defaults it to 0 on Vercel,
+# where each instance only sees the rows it logged itself.
+HISTORY_MAX_AGE = parse_max_age(os.getenv('HISTORY_MAX_AGE'))
+
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     help_text = (
         "🌸 **Flower Bot Help** 🌸\n\n"
@@ -29,7 +52,12 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "• `/report <period>` → Summary (daily/weekly/monthly)\n"
         "• `/detailed <period>` → Full transaction list + stats\n"
         "• `/sales <name>` → History for a specific person\n"
-        "• `/sales` → Your own history"
+        "• `/sales` → Your own history\n\n"
+        "**📦 Inventory**\n"
+        "• `/stock` → Grams on hand and average cost\n"
+        "• `/margin` → Realized margin on sales\n\n"
+        "**📤 Export**\n"
+        "• `/export [csv|gz] [from=YYYY-MM-DD] [to=YYYY-MM-DD] [seller=Name]` → Full history as a file"
     )
     await context.bot.send_message(chat_id=update.effective_chat.id, text=help_text, parse_mode='Markdown')
 
@@ -54,7 +82,18 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     if data:
         # data: {'type', 'amount', 'entity', 'price'}
+        # The parser accepts things like 'nan' or '-100'; keep them out of the sheet and ledger
+        if not all(math.isfinite(data[key]) and data[key] > 0 for key in ('amount', 'price')):
+            await context.bot.send_message(
+                chat_id=update.effective_chat.id,
+                text="❌ Amount and price must be positive numbers."
+            )
+            return
+
         seller_name = update.effective_user.first_name or "Unknown"
+
+        # Load the history before writing, so the ledger can check this row against stock
+        history_ready = transactions.loaded or await load_history()
         
         success = log_transaction(
             seller=seller_name,
@@ -65,12 +104,23 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         
         if success:
+            if history_ready:
+                transactions.append(
+                    datetime.now(), seller_name, data['type'], data['entity'], data['amount'], data['price']
+                )
+                warning = ledger.apply(data['type'], data['amount'], data['price'])
+            else:
+                # The row is in the sheet and is picked up by the next successful load
+                warning = "⚠️ History could not be loaded, so stock was not checked."
+
             # Logged: 3g sold to Priya for ₹450 by <message sender name>
             action_verb = "sold to" if data['type'] == 'Sale' else "bought from"
             response = (
                 f"Logged: {data['amount']}g {action_verb} {data['entity']} "
                 f"for ₹{data['price']} by {seller_name}"
             )
+            if warning:
+                response += f"\n{warning}"
         else:
             response = "❌ Error recording transaction. Please check the logs."
             
@@ -86,6 +136,9 @@ async def report_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await context.bot.send_message(chat_id=update.effective_chat.id, text="Usage: /report <daily|weekly|monthly>")
         return
 
+    if not await ensure_history(update, context):
+        return
+
     await context.bot.send_message(chat_id=update.effective_chat.id, text="⏳ Generating report...")
     report_text = generate_report(period)
     await context.bot.send_message(chat_id=update.effective_chat.id, text=report_text, parse_mode='Markdown')
@@ -99,6 +152,9 @@ async def detailed_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await context.bot.send_message(chat_id=update.effective_chat.id, text="Usage: /detailed <daily|weekly|monthly>")
         return
 
+    if not await ensure_history(update, context):
+        return
+
     await context.bot.send_message(chat_id=update.effective_chat.id, text="⏳ Generating detailed report...")
     report_text = generate_detailed_report(period)
     # Split message if too long (Telegram limit is 4096 chars)
@@ -122,6 +178,9 @@ async def sales_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         await context.bot.send_message(chat_id=update.effective_chat.id, text="Could not determine name. Usage: /sales <name>")
         return
 
+    if not await ensure_history(update, context):
+        return
+
     await context.bot.send_message(chat_id=update.effective_chat.id, text=f"⏳ Generating report for {target_name}...")
     
     # Parse response logic here?
@@ -134,16 +193,91 @@ async def sales_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     await context.bot.send_message(chat_id=update.effective_chat.id, text=report_text, parse_mode='Markdown')
 
+async def stock_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not await ensure_history(update, context):
+        return
+    await context.bot.send_message(chat_id=update.effective_chat.id, text=ledger.stock_report(), parse_mode='Markdown')
+
+async def margin_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    if not await ensure_history(update, context):
+        return
+    await context.bot.send_message(chat_id=update.effective_chat.id, text=ledger.margin_report(), parse_mode='Markdown')
+
+async def export_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Usage: /export [csv|gz] [from=YYYY-MM-DD] [to=YYYY-MM-DD] [seller=Name]
+    Sends the transaction history as a CSV (or gzip CSV) document.
+    """
+    try:
+        options = parse_export_args(context.args or [])
+    except ValueError:
+        await context.bot.send_message(
+            chat_id=update.effective_chat.id,
+            text="Usage: /export [csv|gz] [from=YYYY-MM-DD] [to=YYYY-MM-DD] [seller=Name]"
+        )
+        return
+
+    await context.bot.send_message(chat_id=update.effective_chat.id, text="⏳ Preparing export...")
+
+    try:
+        f, count, source = export_to_tempfile(options)
+    except Exception as e:
+        logging.error(f"Export failed: {e}")
+        await context.bot.send_message(chat_id=update.effective_chat.id, text="❌ Export failed. Please check the logs.")
+        return
+
+    with f:
+        await context.bot.send_document(
+            chat_id=update.effective_chat.id,
+            document=f,
+            filename=export_filename(options["compress"]),
+            caption=f"📤 {count} transactions from {source}"
+        )
+
+async def load_history(application=None):
+    """
+    Loads the sheet history into the in-memory store and rebuilds the ledger.
+    Returns True on success. Runs at startup and again whenever the history is missing.
+    """
+    try:
+        count = transactions.reload(iter_sheet_rows())
+    except Exception as e:
+        logging.error(f"Could not load transaction history: {e}")
+        return False
+    ledger.rebuild(transactions)
+    logging.info(f"Loaded {count} transactions from history.")
+    return True
+
+async def ensure_history(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Makes sure the history is loaded (and no older than HISTORY_MAX_AGE)
+    before answering from it. Replies with an error and returns False if it
+    can't be loaded.
+    """
+    is_current = transactions.loaded and (
+        HISTORY_MAX_AGE is None or transactions.age() <= HISTORY_MAX_AGE
+    )
+    if is_current or await load_history():
+        return True
+    await context.bot.send_message(
+        chat_id=update.effective_chat.id,
+        text="❌ Could not load transaction history from Google Sheets. Please try again later."
+    )
+    return False
+
 # Initialize app globally for Vercel import
 app = None
 if os.getenv('TELEGRAM_BOT_TOKEN'):
     token = os.getenv('TELEGRAM_BOT_TOKEN')
-    app = ApplicationBuilder().token(token).build()
+    app = ApplicationBuilder().token(token).post_init(load_history).build()
     app.add_handler(CommandHandler('start', start))
     app.add_handler(CommandHandler('help', help_command))
     app.add_handler(CommandHandler('report', report_command))
     app.add_handler(CommandHandler('detailed', detailed_command))
     app.add_handler(CommandHandler('sales', sales_command))
+    app.add_handler(CommandHandler('stock', stock_command))
+    app.add_handler(CommandHandler('margin', margin_command))
+    app.add_handler(CommandHandler('export', export_command))
     app.add_handler(MessageHandler(filters.TEXT & (~filters.COMMAND), handle_message))
 
 if __name__ == '__main__':
@@ -27,6 +27,10 @@ if not os.path.exists(CREDS_FILE):
 
 SHEET_NAME = "telegram-bot-427"
 
+HEADERS = [
+    "Timestamp", "Seller", "Action", "Buyer/Source", "Amount(g)", "Price(INR)", "WeekID"
+]
+
 import json
 
 def get_client():
@@ -80,9 +84,7 @@ def get_or_create_sheet(client):
             logger.info(f"Worksheet '{worksheet_name}' not found. Creating it...")
             worksheet = spreadsheet.add_worksheet(title=worksheet_name, rows=100, cols=10)
             # Add headers
-            worksheet.append_row([
-                "Timestamp", "Seller", "Action", "Buyer/Source", "Amount(g)", "Price(INR)", "WeekID"
-            ])
+            worksheet.append_row(HEADERS)
 
         return worksheet
     except Exception as e:
@@ -115,3 +117,19 @@ def log_transaction(seller, action, entity, amount, price):
     except Exception as e:
         logger.error(f"Failed to append row: {e}")
         return False
+
+def iter_sheet_rows():
+    """
+    Yields every transaction row (as a list of strings) worksheet by worksheet,
+    so only one worksheet is held in memory at a time. Header rows are skipped.
+    """
+    client = get_client()
+    if not client:
+        raise ConnectionError("Could not authenticate with Google Sheets")
+
+    spreadsheet = client.open(SHEET_NAME)
+    for worksheet in spreadsheet.worksheets():
+        values = worksheet.get_all_values()
+        for row in values[1:]:
+            yield row
+        del values
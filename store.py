@@ -0,0 +1,157 @@
+import logging
+import time
+from array import array
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+
+class StringColumn:
+    """
+    Dictionary-encoded string column.
+    Each distinct value is stored once; rows hold a uint32 code into `values`.
+    """
+
+    def __init__(self):
+        self.values = []          # code -> string
+        self.index = {}           # string -> code
+        self.codes = array('I')   # one code per row
+
+    def append(self, value):
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self.index[value] = code
+        self.codes.append(code)
+
+    def code_of(self, value):
+        """Returns the code for value, or None if it never occurs."""
+        return self.index.get(value)
+
+    def codes_where(self, predicate):
+        """Returns the set of codes whose string satisfies predicate."""
+        return {code for code, value in enumerate(self.values) if predicate(value)}
+
+    def __getitem__(self, row):
+        return self.values[self.codes[row]]
+
+
+class TransactionStore:
+    """
+    Column store for the rows written by log_transaction.
+
+    Amounts and prices are float64 arrays (NaN for unreadable cells), timestamps are int64 seconds
+    since the epoch (the sheet's naive local time, read as UTC), and
+    Seller, Action and Buyer/Source are dictionary-encoded. WeekID is not
+    stored since it is derived from the timestamp.
+    """
+
+    def __init__(self):
+        self.timestamps = array('q')
+        self.amounts = array('d')
+        self.prices = array('d')
+        self.sellers = StringColumn()
+        self.actions = StringColumn()
+        self.entities = StringColumn()
+        self.loaded = False       # set once the sheet history has been read
+        self.loaded_at = None     # time.monotonic() of the last successful load
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def append(self, timestamp, seller, action, entity, amount, price):
+        """Appends one transaction. `timestamp` is a datetime or epoch seconds."""
+        if isinstance(timestamp, datetime):
+            timestamp = to_epoch(timestamp)
+        self.timestamps.append(int(timestamp))
+        self.amounts.append(amount)
+        self.prices.append(price)
+        self.sellers.append(seller)
+        self.actions.append(action)
+        self.entities.append(entity)
+
+    def load_rows(self, rows):
+        """
+        Appends an iterable of raw sheet rows. Returns the number of rows added.
+        Rows with an unreadable timestamp are skipped; bad numbers become NaN.
+        """
+        parse = datetime.fromisoformat
+        columns = (self.sellers, self.actions, self.entities)
+        timestamps, amounts, prices = self.timestamps, self.amounts, self.prices
+        added = skipped = 0
+        for row in rows:
+            try:
+                ts = (parse(str(row[0]).strip()) - EPOCH) // ONE_SECOND
+            except (IndexError, ValueError):
+                skipped += 1
+                continue
+
+            if len(row) < 6:
+                row = list(row) + [''] * (6 - len(row))
+            timestamps.append(ts)
+            amounts.append(to_number(row[4]))
+            prices.append(to_number(row[5]))
+            for column, value in zip(columns, (row[1], row[2], row[3])):
+                column.append(str(value))
+            added += 1
+
+        if skipped:
+            logger.warning(f"Skipped {skipped} rows with unreadable timestamps")
+        return added
+
+    def reload(self, rows):
+        """
+        Replaces the contents with the given history and marks the store loaded.
+        If reading rows raises, the current contents are left untouched.
+        """
+        fresh = TransactionStore()
+        count = fresh.load_rows(rows)
+        self.timestamps, self.amounts, self.prices = fresh.timestamps, fresh.amounts, fresh.prices
+        self.sellers, self.actions, self.entities = fresh.sellers, fresh.actions, fresh.entities
+        self.loaded = True
+        self.loaded_at = time.monotonic()
+        return count
+
+    def age(self):
+        """Seconds since the history was last loaded, or None if never loaded."""
+        return None if self.loaded_at is None else time.monotonic() - self.loaded_at
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Builds a store from an iterable of raw sheet rows."""
+        store = cls()
+        store.load_rows(rows)
+        return store
+
+    def timestamp(self, row):
+        return EPOCH + timedelta(seconds=self.timestamps[row])
+
+    def rows_since(self, start):
+        """Returns the row indices with a timestamp at or after `start` (a datetime)."""
+        start_ts = to_epoch(start)
+        return [i for i, ts in enumerate(self.timestamps) if ts >= start_ts]
+
+    def chronological(self):
+        """Returns all row indices in timestamp order."""
+        return sorted(range(len(self)), key=self.timestamps.__getitem__)
+
+
+NAN = float('nan')
+EPOCH = datetime(1970, 1, 1)
+ONE_SECOND = timedelta(seconds=1)
+
+def to_epoch(dt):
+    """Naive datetime -> int seconds, treating the wall-clock time as UTC."""
+    return (dt - EPOCH) // ONE_SECOND
+
+def to_number(value):
+    """Coerces a sheet cell to float; blanks and bad values become NaN."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+# Shared in-memory history used by analytics and the inventory ledger
+transactions = TransactionStore()
@@ -0,0 +1,96 @@
+import csv
+import gzip
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import export
+from export import parse_export_args, filter_rows, write_csv, iter_snapshot_rows, export_to_tempfile
+
+ROWS = [
+    ["2025-12-01 09:00:00", "Alice", "Buy", "Supplier", "100", "500", "202549"],
+    ["2025-12-02 10:00:00", "Bob", "Sale", "Priya", "10", "150", "202549"],
+    ["2025-12-05 18:30:00", "alice", "Sale", "Ravi", "20", "300", "202549"],
+]
+
+class TestExport(unittest.TestCase):
+    def test_parse_defaults(self):
+        options = parse_export_args([])
+        self.assertFalse(options["compress"])
+        self.assertIsNone(options["start"])
+        self.assertIsNone(options["seller"])
+
+    def test_parse_options(self):
+        options = parse_export_args(["gz", "from=2025-12-01", "to=2025-12-31", "seller=Alice"])
+        self.assertTrue(options["compress"])
+        self.assertEqual(options["start"], "2025-12-01")
+        self.assertEqual(options["end"], "2025-12-31")
+        self.assertEqual(options["seller"], "Alice")
+
+    def test_parse_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_export_args(["from=yesterday"])
+        with self.assertRaises(ValueError):
+            parse_export_args(["xlsx"])
+
+    def test_filter_by_date_and_seller(self):
+        rows = list(filter_rows(ROWS, start="2025-12-02", end="2025-12-05"))
+        self.assertEqual(len(rows), 2)
+        rows = list(filter_rows(ROWS, seller="ALICE"))
+        self.assertEqual([r[3] for r in rows], ["Supplier", "Ravi"])
+
+    def test_write_csv(self):
+        buf = io.BytesIO()
+        count = write_csv(iter(ROWS), buf)
+        self.assertEqual(count, 3)
+        lines = list(csv.reader(io.StringIO(buf.getvalue().decode('utf-8'))))
+        self.assertEqual(lines[0][0], "Timestamp")
+        self.assertEqual(lines[1], ROWS[0])
+
+    def test_write_gzip(self):
+        buf = io.BytesIO()
+        write_csv(iter(ROWS[:1] + [["2025-12-03 08:00:00", "Bob"]]), buf, compress=True)
+        self.assertFalse(buf.closed)
+        lines = list(csv.reader(io.StringIO(gzip.decompress(buf.getvalue()).decode('utf-8'))))
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(len(lines[2]), 7)
+
+class TestSnapshotExport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "snapshot.csv")
+        with open(self.path, "w", newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Timestamp", "Seller", "Action", "Buyer/Source", "Amount(g)", "Price(INR)", "WeekID"])
+            writer.writerows(ROWS)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_iter_snapshot_rows(self):
+        self.assertEqual(list(iter_snapshot_rows(self.path)), ROWS)
+
+    def test_export_from_snapshot(self):
+        options = parse_export_args(["seller=alice"])
+        with mock.patch.dict(os.environ, {"EXPORT_SNAPSHOT": self.path}):
+            f, count, source = export_to_tempfile(options)
+        with f:
+            lines = list(csv.reader(io.StringIO(f.read().decode('utf-8'))))
+        self.assertEqual(count, 2)
+        self.assertEqual(lines[1:], [ROWS[0], ROWS[2]])
+        self.assertIn("snapshot.csv (modified ", source)
+
+    def test_snapshot_is_opt_in(self):
+        sheet_rows = iter([ROWS[1]])
+        env = {k: v for k, v in os.environ.items() if k != "EXPORT_SNAPSHOT"}
+        with mock.patch.dict(os.environ, env, clear=True), \
+                mock.patch.object(export, "iter_sheet_rows", return_value=sheet_rows):
+            f, count, source = export_to_tempfile(parse_export_args([]))
+        f.close()
+        self.assertEqual(count, 1)
+        self.assertEqual(source, "Google Sheets")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import gzip
+import io
+import os
+import unittest
+from http.client import HTTPMessage
+from unittest import mock
+
+import api.export_csv as export_csv
+
+ROW = ["2025-12-02 10:00:00", "Bob", "Sale", "Priya", "10", "150", "202549"]
+
+def run_request(path, token="secret"):
+    """Runs the handler against an in-memory request; returns (status, headers, body)."""
+    h = export_csv.handler.__new__(export_csv.handler)
+    h.path = path
+    h.headers = HTTPMessage()
+    if token:
+        h.headers['Authorization'] = f"Bearer {token}"
+    h.wfile = io.BytesIO()
+    h.command = 'GET'
+    h.request_version = 'HTTP/1.1'
+    h.requestline = f"GET {path} HTTP/1.1"
+    h.client_address = ('127.0.0.1', 0)
+    h.close_connection = False
+    h.do_GET()
+
+    head, _, body = h.wfile.getvalue().partition(b"\r\n\r\n")
+    lines = head.decode('latin-1').split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = dict(line.split(": ", 1) for line in lines[1:])
+    return status, headers, body
+
+def dechunk(body):
+    """Decodes a chunked body. Returns (data, complete)."""
+    data = b""
+    while body:
+        size_line, _, rest = body.partition(b"\r\n")
+        size = int(size_line, 16)
+        if size == 0:
+            return data, True
+        data += rest[:size]
+        body = rest[size + 2:]
+    return data, False
+
+def fake_rows(rows, fail=False):
+    def generate():
+        yield from rows
+        if fail:
+            raise ConnectionError("sheet went away")
+    return mock.patch.object(export_csv, "iter_rows", return_value=(generate(), "Google Sheets"))
+
+@mock.patch.dict(os.environ, {"EXPORT_TOKEN": "secret"})
+class TestExportHandler(unittest.TestCase):
+    def test_rejects_missing_or_wrong_token(self):
+        self.assertEqual(run_request("/api/export", token=None)[0], 403)
+        self.assertEqual(run_request("/api/export", token="wrong")[0], 403)
+
+    def test_bad_option(self):
+        self.assertEqual(run_request("/api/export?from=yesterday")[0], 400)
+
+    def test_streams_complete_csv(self):
+        with fake_rows([ROW]):
+            status, headers, body = run_request("/api/export?seller=bob")
+        data, complete = dechunk(body)
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['Transfer-Encoding'], 'chunked')
+        self.assertEqual(headers['X-Export-Source'], 'Google Sheets')
+        self.assertTrue(complete)
+        self.assertEqual(data.decode('utf-8').splitlines()[1], ",".join(ROW))
+
+    def test_source_failure_returns_500(self):
+        with fake_rows([], fail=True):
+            status, _, body = run_request("/api/export")
+        self.assertEqual(status, 500)
+        self.assertEqual(body, b"Export failed")
+
+    def test_mid_stream_failure_is_incomplete(self):
+        with fake_rows([ROW] * 5000, fail=True):
+            status, _, body = run_request("/api/export?format=gz")
+        data, complete = dechunk(body)
+        self.assertEqual(status, 200)
+        self.assertTrue(data)
+        self.assertFalse(complete)
+        with self.assertRaises(EOFError):
+            gzip.decompress(data)
+
+if __name__ == '__main__':
+    unittest.main()
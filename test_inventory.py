@@ -0,0 +1,86 @@
+import unittest
+from inventory import Ledger
+from store import TransactionStore
+
+class TestLedger(unittest.TestCase):
+    def test_buy_updates_stock_and_cost(self):
+        ledger = Ledger()
+        ledger.apply('Buy', 100, 500)
+        ledger.apply('Buy', 100, 700)
+        self.assertEqual(ledger.stock, 200.0)
+        self.assertAlmostEqual(ledger.avg_cost, 6.0)
+
+    def test_sale_realizes_margin(self):
+        ledger = Ledger()
+        ledger.apply('Buy', 100, 500)
+        warning = ledger.apply('Sale', 40, 400)
+        self.assertIsNone(warning)
+        self.assertEqual(ledger.stock, 60.0)
+        self.assertAlmostEqual(ledger.cogs, 200.0)
+        self.assertAlmostEqual(ledger.margin, 200.0)
+        self.assertEqual(ledger.last_sale, (40.0, 400.0, 200.0, 200.0))
+
+    def test_oversell_warns(self):
+        ledger = Ledger()
+        ledger.apply('Buy', 10, 50)
+        warning = ledger.apply('Sale', 15, 150)
+        self.assertIsNotNone(warning)
+        self.assertEqual(ledger.stock, -5.0)
+
+    def test_rounding_does_not_warn(self):
+        ledger = Ledger()
+        ledger.apply('Buy', 0.3, 3)
+        ledger.apply('Sale', 0.1, 2)
+        self.assertIsNone(ledger.apply('Sale', 0.2, 4))
+        self.assertEqual(ledger.stock, 0.0)
+        self.assertNotIn("negative", ledger.stock_report())
+
+    def test_non_finite_values_are_ignored(self):
+        ledger = Ledger()
+        ledger.apply('Buy', 100, 500)
+        self.assertIsNone(ledger.apply('Sale', float('nan'), 500))
+        self.assertIsNone(ledger.apply('Buy', float('inf'), 5))
+        self.assertEqual(ledger.stock, 100.0)
+        self.assertAlmostEqual(ledger.avg_cost, 5.0)
+        self.assertEqual(ledger.sales_count, 0)
+
+    def test_buy_that_empties_stock_does_not_divide_by_zero(self):
+        ledger = Ledger()
+        ledger.apply('Buy', 100, 500)
+        ledger.apply('Buy', -100, 500)
+        self.assertEqual(ledger.stock, 0.0)
+        self.assertEqual(ledger.avg_cost, 0.0)
+
+    def test_buy_after_shortfall_resets_cost(self):
+        ledger = Ledger()
+        ledger.apply('Sale', 5, 50)
+        ledger.apply('Buy', 20, 160)
+        self.assertEqual(ledger.stock, 15.0)
+        self.assertAlmostEqual(ledger.avg_cost, 8.0)
+
+    def test_rebuild_orders_by_timestamp(self):
+        store = TransactionStore.from_rows([
+            ["2025-12-02 10:00:00", "Alice", "Sale", "Priya", "50", "500", "202549"],
+            ["2025-12-01 10:00:00", "Alice", "Buy", "Supplier", "100", "600", "202549"],
+        ])
+        ledger = Ledger()
+        ledger.rebuild(store)
+        self.assertEqual(ledger.stock, 50.0)
+        self.assertAlmostEqual(ledger.margin, 200.0)
+        self.assertEqual(ledger.buys_count, 1)
+
+    def test_rebuild_skips_unreadable_numbers(self):
+        store = TransactionStore.from_rows([
+            ["2025-12-01 10:00:00", "Alice", "Buy", "Supplier", "100", "500", "202549"],
+            ["2025-12-02 10:00:00", "Alice", "Buy", "Supplier", "", "500", "202549"],
+            ["2025-12-03 10:00:00", "Alice", "Sale", "Priya", "10", "n/a", "202549"],
+        ])
+        ledger = Ledger()
+        ledger.rebuild(store)
+        self.assertAlmostEqual(ledger.avg_cost, 5.0)
+        self.assertEqual(ledger.buys_count, 1)
+        self.assertEqual(ledger.sales_count, 0)
+        self.assertEqual(ledger.stock, 100.0)
+
+if __name__ == '__main__':
+    unittest.main()
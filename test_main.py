@@ -0,0 +1,105 @@
+import unittest
+from unittest import mock
+
+import main
+from inventory import Ledger
+from store import TransactionStore
+
+def failing_rows():
+    raise ConnectionError("sheet unavailable")
+    yield
+
+class TestParseMaxAge(unittest.TestCase):
+    def test_valid_values(self):
+        self.assertIsNone(main.parse_max_age(None))
+        self.assertIsNone(main.parse_max_age(""))
+        self.assertEqual(main.parse_max_age("0"), 0.0)
+        self.assertEqual(main.parse_max_age("60"), 60.0)
+
+    def test_invalid_values_fall_back(self):
+        for value in ("5m", "-1", "nan"):
+            with self.assertLogs(level="WARNING"):
+                self.assertIsNone(main.parse_max_age(value))
+
+class TestHistoryLoading(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.store = TransactionStore()
+        patcher = mock.patch.object(main, "transactions", self.store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.update = mock.Mock()
+        self.context = mock.Mock()
+        self.context.args = []
+        self.context.bot.send_message = mock.AsyncMock()
+
+    async def test_commands_reply_with_error_until_loaded(self):
+        with mock.patch.object(main, "iter_sheet_rows", side_effect=failing_rows):
+            self.assertFalse(await main.load_history())
+            await main.stock_command(self.update, self.context)
+        self.assertFalse(self.store.loaded)
+        text = self.context.bot.send_message.call_args.kwargs["text"]
+        self.assertIn("Could not load transaction history", text)
+
+    async def test_retries_on_next_command(self):
+        rows = [["2025-12-01 10:00:00", "Alice", "Buy", "Supplier", "100", "500", "202549"]]
+        with mock.patch.object(main, "iter_sheet_rows", side_effect=failing_rows):
+            await main.margin_command(self.update, self.context)
+        with mock.patch.object(main, "iter_sheet_rows", return_value=iter(rows)):
+            await main.stock_command(self.update, self.context)
+        self.assertTrue(self.store.loaded)
+        self.assertIn("Stock on Hand", self.context.bot.send_message.call_args.kwargs["text"])
+
+    async def test_max_age_refreshes_history(self):
+        rows = [["2025-12-01 10:00:00", "Alice", "Buy", "Supplier", "100", "500", "202549"]]
+        with mock.patch.object(main, "HISTORY_MAX_AGE", 0), \
+                mock.patch.object(main, "iter_sheet_rows", side_effect=lambda: iter(rows)) as sheet:
+            await main.stock_command(self.update, self.context)
+            await main.stock_command(self.update, self.context)
+        self.assertEqual(sheet.call_count, 2)
+
+    async def test_loaded_history_is_kept_without_max_age(self):
+        self.store.reload([])
+        with mock.patch.object(main, "HISTORY_MAX_AGE", None), \
+                mock.patch.object(main, "iter_sheet_rows") as sheet:
+            await main.stock_command(self.update, self.context)
+        sheet.assert_not_called()
+
+    async def test_rejects_non_finite_or_non_positive_values(self):
+        with mock.patch.object(main, "log_transaction") as log:
+            for text in ("nan, 500", "buy inf, 5", "buy -100, 500", "100, 0"):
+                self.update.message.text = text
+                await main.handle_message(self.update, self.context)
+        log.assert_not_called()
+        self.assertIn("positive numbers", self.context.bot.send_message.call_args.kwargs["text"])
+
+    async def test_cold_start_loads_history_before_logging(self):
+        rows = [["2025-12-01 10:00:00", "Alice", "Buy", "Supplier", "10", "50", "202549"]]
+        calls = []
+        def sheet_rows():
+            calls.append("load")
+            return iter(rows)
+        def log(**kwargs):
+            calls.append("log")
+            return True
+        self.update.message.text = "20, Priya, 300"
+        self.update.effective_user.first_name = "Alice"
+        with mock.patch.object(main, "iter_sheet_rows", side_effect=sheet_rows), \
+                mock.patch.object(main, "log_transaction", side_effect=log), \
+                mock.patch.object(main, "ledger", Ledger()) as ledger:
+            await main.handle_message(self.update, self.context)
+        self.assertEqual(calls, ["load", "log"])
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(ledger.stock, -10.0)
+        self.assertIn("exceeds stock on hand (10g)", self.context.bot.send_message.call_args.kwargs["text"])
+
+    async def test_logs_without_stock_check_if_history_fails(self):
+        self.update.message.text = "20, 300"
+        with mock.patch.object(main, "iter_sheet_rows", side_effect=failing_rows), \
+                mock.patch.object(main, "log_transaction", return_value=True) as log:
+            await main.handle_message(self.update, self.context)
+        log.assert_called_once()
+        self.assertEqual(len(self.store), 0)
+        self.assertIn("stock was not checked", self.context.bot.send_message.call_args.kwargs["text"])
+
+if __name__ == '__main__':
+    unittest.main()
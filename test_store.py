@@ -0,0 +1,91 @@
+import math
+import unittest
+from datetime import datetime
+from store import TransactionStore
+from analytics import generate_report, generate_detailed_report, generate_person_report
+
+ROWS = [
+    ["2025-12-01 09:00:00", "Alice", "Buy", "Supplier", "100", "500", "202549"],
+    ["2025-12-02 10:00:00", "Bob", "Sale", "Priya", "10", "150", "202549"],
+    ["2025-12-03 18:30:00", "alice", "Sale", "Priya", "20", "300", "202549"],
+    ["not a date", "Bob", "Sale", "Ravi", "5", "50", "202549"],
+    ["2025-12-04 08:00:00", "Bob", "Sale", "Ravi", "", "abc", "202549"],
+]
+
+class TestTransactionStore(unittest.TestCase):
+    def test_load_rows(self):
+        store = TransactionStore.from_rows(ROWS)
+        self.assertEqual(len(store), 4)
+        self.assertEqual(store.timestamp(1), datetime(2025, 12, 2, 10, 0, 0))
+        self.assertEqual(store.sellers[2], "alice")
+        self.assertEqual(store.amounts[1], 10.0)
+        self.assertTrue(math.isnan(store.prices[3]))
+        self.assertTrue(math.isnan(store.amounts[3]))
+
+    def test_strings_are_dictionary_encoded(self):
+        store = TransactionStore.from_rows(ROWS)
+        self.assertEqual(store.actions.values, ["Buy", "Sale"])
+        self.assertEqual(list(store.entities.codes), [0, 1, 1, 2])
+
+    def test_append_and_filters(self):
+        store = TransactionStore()
+        store.append(datetime(2025, 12, 5, 12, 0, 0), "Alice", "Sale", "Ravi", 5.0, 75.0)
+        store.append(datetime(2025, 12, 1, 12, 0, 0), "Alice", "Buy", "Supplier", 50.0, 250.0)
+        self.assertEqual(store.rows_since(datetime(2025, 12, 2)), [0])
+        self.assertEqual(store.chronological(), [1, 0])
+
+class TestReload(unittest.TestCase):
+    def test_reload_replaces_contents(self):
+        store = TransactionStore()
+        self.assertFalse(store.loaded)
+        store.append(datetime(2025, 12, 5), "Alice", "Sale", "Ravi", 5.0, 75.0)
+        self.assertEqual(store.reload(ROWS), 4)
+        self.assertTrue(store.loaded)
+        self.assertEqual(len(store), 4)
+
+    def test_failed_reload_keeps_state(self):
+        def failing():
+            yield ROWS[0]
+            raise ConnectionError("sheet went away")
+        store = TransactionStore.from_rows(ROWS[:2])
+        with self.assertRaises(ConnectionError):
+            store.reload(failing())
+        self.assertFalse(store.loaded)
+        self.assertEqual(len(store), 2)
+
+class TestAnalyticsOnStore(unittest.TestCase):
+    def setUp(self):
+        now = datetime.now().replace(microsecond=0)
+        self.store = TransactionStore()
+        self.store.append(now, "Alice", "Buy", "Supplier", 100.0, 500.0)
+        self.store.append(now, "Alice", "Sale", "Priya", 10.0, 150.0)
+        self.store.append(now, "Bob", "Sale", "Ravi", 20.0, 200.0)
+
+    def test_report(self):
+        report = generate_report('daily', store=self.store)
+        self.assertIn("Volume: 30.0g", report)
+        self.assertIn("Revenue: 350.0 INR", report)
+        self.assertIn("Net Profit:** -150.0 INR", report)
+
+    def test_detailed_report(self):
+        report = generate_detailed_report('monthly', store=self.store)
+        self.assertIn("Txns: 2 Sales, 1 Buys", report)
+        self.assertIn("Top Buyer: Ravi (₹200.0)", report)
+
+    def test_person_report(self):
+        report = generate_person_report("ALICE", store=self.store)
+        self.assertIn("Rev: ₹150.0", report)
+        self.assertIn("Txns: 1", report)
+        self.assertEqual(generate_person_report("Carol", store=self.store), "No transactions found for 'Carol'.")
+
+    def test_unreadable_numbers_are_skipped(self):
+        self.store.append(datetime.now().replace(microsecond=0), "Bob", "Sale", "Ravi", float('nan'), float('nan'))
+        report = generate_report('daily', store=self.store)
+        self.assertIn("Revenue: 350.0 INR", report)
+
+    def test_empty_and_invalid(self):
+        self.assertEqual(generate_report('daily', store=TransactionStore()), "No data available.")
+        self.assertEqual(generate_report('yearly', store=self.store), "Invalid period.")
+
+if __name__ == '__main__':
+    unittest.main()